@@ -1,12 +1,30 @@
 import pandas as pd
+import numpy as np
 import os
+import io
 from datetime import datetime, timedelta
 import re
+import csv
+import functools
+import importlib.util
+import itertools
+from collections import namedtuple
 from colorama import init, Fore, Style
 
 # Initialize colorama for Windows compatibility
 init()
 
+# Excel engine: python-calamine (Rust-based, pandas 2.2+) parses large workbooks
+# many times faster than openpyxl; fall back to pandas' default when unavailable
+if importlib.util.find_spec('python_calamine') is not None:
+    _EXCEL_ENGINE = 'calamine' if tuple(int(v) for v in pd.__version__.split('.')[:2]) >= (2, 2) else None
+else:
+    _EXCEL_ENGINE = None
+
+# Interval column name patterns, compiled once
+_KW_RE = re.compile(r'KW_INTERVAL_(\d+)')
+_TIME_RE = re.compile(r'(\d{4})$')
+
 # Color shortcuts
 WHITE = Fore.WHITE  # Default text color
 GREEN = Fore.LIGHTGREEN_EX
@@ -18,18 +36,103 @@ def oprint(*args, **kwargs):
     import builtins
     builtins.print(*args, **kwargs)
 
+# Head of an input file, read once and shared by the is_*_format checks
+FormatProbe = namedtuple('FormatProbe', ['ext', 'csv_lines', 'csv_head', 'excel_head', 'sheet_names'])
+
+def _probe(input_file):
+    """Return the cached FormatProbe for a file (re-read if the file has changed)"""
+    stat = os.stat(input_file)
+    return _read_probe(os.path.abspath(input_file), stat.st_mtime_ns, stat.st_size)
+
+@functools.lru_cache(maxsize=32)
+def _read_probe(path, mtime_ns, size):
+    """Read enough of the file for every format check: 100+ lines / 3000+ chars of a CSV, or the first 50 rows and sheet names of a workbook"""
+    file_ext = os.path.splitext(path)[1].lower()
+    csv_lines = []
+    excel_head = None
+    sheet_names = []
+    
+    if file_ext == '.csv':
+        char_count = 0
+        with open(path, 'r', encoding='utf-8-sig', errors='replace') as f:  # utf-8-sig drops an Excel "CSV UTF-8" BOM
+            for line in f:
+                csv_lines.append(line)
+                char_count += len(line)
+                if len(csv_lines) > 100 and char_count >= 3000:
+                    break
+    elif file_ext == '.xlsx' and _EXCEL_ENGINE is None:
+        # openpyxl's read-only mode streams rows, so only the first 50 get parsed
+        import openpyxl
+        wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        try:
+            sheet_names = wb.sheetnames
+            ws = wb.worksheets[0]
+            ws.reset_dimensions()  # Don't trust the stored sheet size, just read until 50 rows
+            excel_head = pd.DataFrame(list(itertools.islice(ws.iter_rows(values_only=True), 50)))
+        finally:
+            wb.close()
+    elif file_ext in ['.xlsx', '.xls']:
+        with pd.ExcelFile(path, engine=_EXCEL_ENGINE) as xlsx:
+            sheet_names = xlsx.sheet_names
+            excel_head = pd.read_excel(xlsx, header=None, nrows=50)
+    
+    return FormatProbe(file_ext, csv_lines, ''.join(csv_lines), excel_head, sheet_names)
+
+def expand_interval_grid(dates, end_offsets, values):
+    """
+    Convert a wide date x interval grid into long (datetime, usage) format.
+    dates holds one date per row (NaT rows are skipped), end_offsets one timedelta64 per
+    column giving when that interval ends, and values the 2-D usage grid (NaN cells are skipped).
+    """
+    dates = np.asarray(dates)
+    has_date = ~np.isnat(dates)
+    interval_dts = (dates[has_date][:, None] + end_offsets[None, :]).ravel()
+    usage = values[has_date].ravel()
+    has_usage = ~np.isnan(usage)
+    return pd.DataFrame({'datetime': interval_dts[has_usage], 'usage': usage[has_usage]})
+
+def sum_by_date(keys, values, columns, key_name):
+    """
+    Sum rows of a 2-D value block that share the same key (e.g. one row per meter per date).
+    Uses groupby(key).sum(), whose compensated summation keeps the rounded output stable:
+    missing keys are dropped and NaN values count as 0.
+    """
+    df = pd.DataFrame(values, columns=columns)
+    df.insert(0, key_name, np.asarray(keys))
+    return df.groupby(key_name)[columns].sum().reset_index()
+
+def sort_by_datetime(df):
+    """
+    Sort a datetime/usage frame by datetime with a fresh 0..n-1 index.
+    Readers usually produce timestamps in order already, so the sort (and the index
+    rebuild) is skipped when it isn't needed. Ties keep their original order.
+    """
+    if not df['datetime'].is_monotonic_increasing:
+        df = df.sort_values('datetime', kind='stable')
+    if not df.index.equals(pd.RangeIndex(len(df))):
+        df = df.reset_index(drop=True)
+    return df
+
+def sum_by_datetime(df):
+    """
+    Sum usage over repeated timestamps, like groupby('datetime')['usage'].sum() (missing
+    timestamps are dropped and NaN usage counts as 0). Returns a sorted frame. Readers rarely
+    repeat a timestamp, so the groupby only runs when there is something to combine.
+    """
+    df = sort_by_datetime(df[df['datetime'].notna()])
+    if df['datetime'].is_unique:
+        return pd.DataFrame({'datetime': df['datetime'].to_numpy(), 'usage': df['usage'].fillna(0).to_numpy()})
+    return df.groupby('datetime', sort=True)['usage'].sum().reset_index()
+
 def is_comed_format(input_file):
     """Check if this is a COMED format file (with INTERVAL USAGE DATA header and KW_INTERVAL columns)"""
-    file_ext = os.path.splitext(input_file)[1].lower()
-    
     try:
-        if file_ext == '.csv':
-            with open(input_file, 'r') as f:
-                first_lines = f.read(500)
+        probe = _probe(input_file)
+        if probe.ext == '.csv':
+            first_lines = probe.csv_head[:500]
             return 'INTERVAL USAGE DATA' in first_lines and 'KW_INTERVAL' in first_lines
-        elif file_ext in ['.xlsx', '.xls']:
-            df = pd.read_excel(input_file, header=None, nrows=20)
-            content = ' '.join(str(v) for v in df.values.flatten())
+        elif probe.ext in ['.xlsx', '.xls']:
+            content = ' '.join(str(v) for v in probe.excel_head.head(20).values.flatten())
             return 'INTERVAL USAGE DATA' in content or 'KW_INTERVAL' in content
         return False
     except:
@@ -70,7 +173,7 @@ def read_comed_format(input_file):
         df = pd.read_csv(input_file, skiprows=header_row)
     else:
         # Excel file - find header row
-        df_raw = pd.read_excel(input_file, header=None)
+        df_raw = pd.read_excel(input_file, engine=_EXCEL_ENGINE, header=None)
         header_row = None
         for i, row in df_raw.iterrows():
             row_str = ' '.join(str(v) for v in row.values)
@@ -81,7 +184,7 @@ def read_comed_format(input_file):
         if header_row is None:
             raise ValueError("Could not find COMED data header row")
         
-        df = pd.read_excel(input_file, header=header_row)
+        df = pd.read_excel(input_file, engine=_EXCEL_ENGINE, header=header_row)
     
     # Filter to just valid data rows (numeric METER_NBR)
     df = df[pd.to_numeric(df['METER_NBR'], errors='coerce').notna()].copy()
@@ -100,7 +203,8 @@ def read_comed_format(input_file):
     
     # Get interval columns (KW_INTERVAL_1 through KW_INTERVAL_48/96)
     interval_cols = [c for c in df.columns if c.startswith('KW_INTERVAL')]
-    num_intervals = len([c for c in interval_cols if int(re.search(r'(\d+)', c).group(1)) <= 96])
+    interval_nums = {c: int(m.group(1)) for c in interval_cols if (m := _KW_RE.search(c))}
+    num_intervals = len([n for n in interval_nums.values() if n <= 96])
     
     # Determine interval type based on number of columns
     # 96 intervals = 15-min, 48 intervals = 30-min, 24 intervals = hourly
@@ -125,61 +229,38 @@ def read_comed_format(input_file):
         kw_to_kwh_factor = 1.0   # Hourly = no conversion needed
         oprint(f"  Found {len(interval_cols)} interval columns ({interval_minutes}-min data)")
     
-    # Convert interval values to numeric
-    for col in interval_cols:
-        df[col] = pd.to_numeric(df[col], errors='coerce')
+    # Convert interval values to numeric as one float64 block
+    interval_values = df[interval_cols].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
     
     # Group by date and sum all meters together
-    df_summed = df.groupby('RECORDING_DT')[interval_cols].sum().reset_index()
+    df_summed = sum_by_date(df['RECORDING_DT'], interval_values, interval_cols, 'RECORDING_DT')
     
     oprint(f"  Combined {len(df)} rows into {len(df_summed)} dates")
     
-    # Convert to long format (datetime, usage)
-    records = []
-    
-    for _, row in df_summed.iterrows():
-        date_str = row['RECORDING_DT']
-        try:
-            base_date = pd.to_datetime(date_str)
-        except:
+    # Map each interval column to its end time (minutes after midnight)
+    # Interval 1 ends at first interval_minutes, etc.
+    valid_cols = []
+    end_minutes = []
+    for col, interval_num in interval_nums.items():
+        # Skip intervals beyond max (DST extras handled separately)
+        if interval_num > max_intervals:
             continue
         
-        # Process each interval
-        for col in interval_cols:
-            # Extract interval number
-            match = re.search(r'KW_INTERVAL_(\d+)', col)
-            if not match:
-                continue
-            
-            interval_num = int(match.group(1))
-            
-            # Skip intervals beyond max (DST extras handled separately)
-            if interval_num > max_intervals:
-                continue
-            
-            # Calculate end time for this interval
-            # Interval 1 ends at first interval_minutes, etc.
-            total_minutes = interval_num * interval_minutes
-            hour = total_minutes // 60
-            minute = total_minutes % 60
-            
-            if hour == 24:
-                interval_dt = base_date + timedelta(days=1)
-            else:
-                interval_dt = base_date + timedelta(hours=hour, minutes=minute)
-            
-            value = row[col]
-            if pd.notna(value):
-                # Convert kW to kWh using the interval-based factor
-                kwh_value = float(value) * kw_to_kwh_factor
-                records.append({'datetime': interval_dt, 'usage': kwh_value})
+        valid_cols.append(col)
+        end_minutes.append(interval_num * interval_minutes)
+    
+    # Convert kW to kWh using the interval-based factor
+    kwh_values = df_summed[valid_cols].to_numpy(dtype=float) * kw_to_kwh_factor
     
-    result_df = pd.DataFrame(records)
-    result_df = result_df.sort_values('datetime').reset_index(drop=True)
+    # Convert to long format (datetime, usage), skipping dates that fail to parse
+    # The last interval ends at 24:00, which lands on the next day's 0:00
+    base_dates = pd.to_datetime(df_summed['RECORDING_DT'], format='mixed', errors='coerce')
+    result_df = expand_interval_grid(base_dates, np.array(end_minutes, dtype='timedelta64[m]'), kwh_values)
     
     # Sum any duplicate timestamps (shouldn't happen but just in case)
-    result_df = result_df.groupby('datetime')['usage'].sum().reset_index()
-    result_df = result_df.sort_values('datetime').reset_index(drop=True)
+    if not result_df['datetime'].is_unique:
+        result_df = sum_by_datetime(result_df)
+    result_df = sort_by_datetime(result_df)
     
     oprint(f"  Converted to {len(result_df)} interval records")
     
@@ -187,16 +268,13 @@ def read_comed_format(input_file):
 
 def is_duq_format(input_file):
     """Check if this is a DUQ (Duquesne Light) format file with Customer Identity header and Detailed Interval Usage"""
-    file_ext = os.path.splitext(input_file)[1].lower()
-
     try:
-        if file_ext == '.csv':
-            with open(input_file, 'r') as f:
-                first_lines = f.read(3000)
+        probe = _probe(input_file)
+        if probe.ext == '.csv':
+            first_lines = probe.csv_head[:3000]
             return 'Customer Identity' in first_lines and 'Detailed Interval Usage' in first_lines
-        elif file_ext in ['.xlsx', '.xls']:
-            df = pd.read_excel(input_file, header=None, nrows=40)
-            content = ' '.join(str(v) for v in df.values.flatten())
+        elif probe.ext in ['.xlsx', '.xls']:
+            content = ' '.join(str(v) for v in probe.excel_head.head(40).values.flatten())
             return 'Customer Identity' in content and 'Detailed Interval Usage' in content
         return False
     except:
@@ -236,7 +314,7 @@ def read_duq_format(input_file):
         header_row = detail_row + 1
         df = pd.read_csv(input_file, skiprows=header_row, header=0)
     else:
-        df_raw = pd.read_excel(input_file, header=None)
+        df_raw = pd.read_excel(input_file, engine=_EXCEL_ENGINE, header=None)
         detail_row = None
         for i, row in df_raw.iterrows():
             if any('Detailed Interval Usage' in str(v) for v in row.values):
@@ -247,7 +325,7 @@ def read_duq_format(input_file):
             raise ValueError("Could not find 'Detailed Interval Usage' section in DUQ file")
 
         header_row = detail_row + 1
-        df = pd.read_excel(input_file, header=header_row)
+        df = pd.read_excel(input_file, engine=_EXCEL_ENGINE, header=header_row)
 
     # Identify the usage columns (numeric column names 1-24, skip QTY and Quality columns)
     usage_cols = []
@@ -258,46 +336,27 @@ def read_duq_format(input_file):
 
     oprint(f"  Found {len(usage_cols)} hourly interval columns")
 
-    # Build datetime/usage pairs
-    all_rows = []
-    for _, row in df.iterrows():
-        date_str = str(row.iloc[0]).strip()
-        if not date_str or date_str == 'nan':
-            continue
+    # Build datetime/usage pairs from the date x hour grid in one shot,
+    # skipping rows without a parseable Reading Date
+    dates = pd.to_datetime(df.iloc[:, 0].astype(str).str.strip(), format='mixed', errors='coerce')
 
-        try:
-            date = pd.to_datetime(date_str)
-        except:
-            continue
+    # Column 1 → 00:00, Column 24 → 23:00
+    hour_labels = np.array([int(str(col).strip()) - 1 for col in usage_cols], dtype='timedelta64[h]')
 
-        for col in usage_cols:
-            hour_num = int(str(col).strip())  # 1-24
-            hour_label = hour_num - 1  # Column 1 → 00:00, Column 24 → 23:00
-
-            dt = date + timedelta(hours=hour_label)
-
-            val = row[col]
-            if pd.notna(val):
-                try:
-                    usage = float(val)
-                    all_rows.append({'datetime': dt, 'usage': usage})
-                except (ValueError, TypeError):
-                    continue
+    # Non-numeric cells become NaN and are dropped with the blanks
+    usage = df[usage_cols].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
 
-    result_df = pd.DataFrame(all_rows)
+    result_df = expand_interval_grid(dates, hour_labels, usage)
 
     if result_df.empty:
         raise ValueError("No valid interval data found in DUQ file")
 
-    result_df['datetime'] = pd.to_datetime(result_df['datetime'])
-    result_df = result_df.sort_values('datetime').reset_index(drop=True)
+    result_df = sort_by_datetime(result_df)
     oprint(f"  Read {len(result_df)} hourly records")
 
     # Fill partial days (VEE cutoff) using data from 7 days prior (same weekday)
     # Skip the first and last days of the dataset as those are natural boundaries, not VEE issues
-    existing_dts = set(result_df['datetime'])
-    result_df['date'] = result_df['datetime'].dt.date
-    hours_per_day = result_df.groupby('date').size()
+    hours_per_day = result_df.groupby(result_df['datetime'].dt.normalize()).size()
 
     first_date = hours_per_day.index.min()
     last_date = hours_per_day.index.max()
@@ -305,75 +364,63 @@ def read_duq_format(input_file):
 
     if len(partial_days) > 0:
         oprint(f"  Found {len(partial_days)} partial day(s) (VEE cutoff) - filling from same weekday prior week")
-        fill_rows = []
-
-        for day, hour_count in partial_days.items():
-            day_dt = pd.Timestamp(day)
-            missing_hours = []
-            for h in range(24):
-                dt = day_dt + timedelta(hours=h)
-                if dt not in existing_dts:
-                    missing_hours.append(h)
 
+        # Lay the readings out as a day x hour grid (NaN where an hour is missing), placing
+        # each reading by its integer hour offset instead of looking up Timestamps
+        full_idx = pd.date_range(first_date, last_date + timedelta(hours=23), freq='h')
+        hour_offsets = ((result_df['datetime'] - first_date) // timedelta(hours=1)).to_numpy()
+        hour_pos, first_seen = np.unique(hour_offsets, return_index=True)
+        grid = np.full(len(full_idx), np.nan)
+        grid[hour_pos] = result_df['usage'].to_numpy()[first_seen]
+        grid = grid.reshape(-1, 24)
+        grid_dts = full_idx.to_numpy().reshape(-1, 24)
+        day_pos = ((partial_days.index - first_date) // timedelta(days=1)).to_numpy()
+        missing = np.isnan(grid[day_pos])
+
+        # Look for donor day: 7 days prior, then 14, 21, etc. Only complete days qualify,
+        # so walk back from the furthest week and let nearer weeks overwrite
+        is_complete = (hours_per_day.reindex(full_idx[::24]) == 24).to_numpy()
+        donor_pos = np.full(len(day_pos), -1)
+        for weeks_back in range(7, 0, -1):
+            candidate = day_pos - 7 * weeks_back
+            found = candidate >= 0
+            found[found] = is_complete[candidate[found]]
+            donor_pos[found] = candidate[found]
+
+        # Pull values from the donor day for missing hours
+        has_donor = donor_pos >= 0
+        donor_usage = grid[donor_pos]
+        fill_mask = missing & has_donor[:, None] & ~np.isnan(donor_usage)
+
+        for i, day in enumerate(partial_days.index):
+            missing_hours = np.flatnonzero(missing[i]).tolist()
             if not missing_hours:
                 continue
 
-            # Look for donor day: 7 days prior, then 14, 21, etc.
-            donor_day = None
-            for weeks_back in range(1, 8):
-                candidate = day_dt - timedelta(days=7 * weeks_back)
-                candidate_date = candidate.date()
-                if candidate_date in hours_per_day.index and hours_per_day[candidate_date] == 24:
-                    donor_day = candidate
-                    break
-
-            if donor_day is None:
-                oprint(f"    {day}: missing hours {missing_hours} - no donor day found, skipping")
+            if not has_donor[i]:
+                oprint(f"    {day.date()}: missing hours {missing_hours} - no donor day found, skipping")
                 continue
 
-            # Pull values from the donor day for missing hours
-            donor_data = result_df[result_df['date'] == donor_day.date()].set_index(
-                result_df[result_df['date'] == donor_day.date()]['datetime'].dt.hour
-            )
+            donor_day = full_idx[donor_pos[i] * 24]
+            oprint(f"    {day.date()}: filled {fill_mask[i].sum()} missing hour(s) from {donor_day.date()}")
 
-            filled_count = 0
-            for h in missing_hours:
-                if h in donor_data.index:
-                    donor_usage = donor_data.loc[h, 'usage']
-                    fill_dt = day_dt + timedelta(hours=h)
-                    fill_rows.append({'datetime': fill_dt, 'usage': float(donor_usage)})
-                    filled_count += 1
-
-            oprint(f"    {day}: filled {filled_count} missing hour(s) from {donor_day.date()}")
-
-        if fill_rows:
-            fill_df = pd.DataFrame(fill_rows)
-            fill_df['datetime'] = pd.to_datetime(fill_df['datetime'])
+        if fill_mask.any():
+            fill_df = pd.DataFrame({'datetime': grid_dts[day_pos][fill_mask], 'usage': donor_usage[fill_mask]})
             result_df = pd.concat([result_df, fill_df], ignore_index=True)
-            result_df = result_df.sort_values('datetime').reset_index(drop=True)
+            result_df = sort_by_datetime(result_df)
             oprint(f"  Total after filling: {len(result_df)} hourly records")
 
-    result_df = result_df.drop(columns=['date'], errors='ignore')
     return result_df
 
 def is_first_energy_format(input_file):
     """Check if this is a First Energy format file (with Customer Identifier and Detailed Interval Usage)"""
-    file_ext = os.path.splitext(input_file)[1].lower()
-    
     try:
-        if file_ext in ['.xlsx', '.xls']:
-            df = pd.read_excel(input_file, header=None, nrows=50)
-            col0_values = [str(v) for v in df.iloc[:, 0].values]
-        elif file_ext == '.csv':
-            # CSV may have inconsistent columns, so read with on_bad_lines='skip'
-            # Try different encodings
-            for encoding in ['utf-8', 'latin-1', None]:
-                try:
-                    df = pd.read_csv(input_file, header=None, nrows=50, on_bad_lines='skip', encoding=encoding)
-                    break
-                except:
-                    continue
-            col0_values = [str(v) for v in df.iloc[:, 0].values]
+        probe = _probe(input_file)
+        if probe.ext in ['.xlsx', '.xls']:
+            col0_values = [str(v) for v in probe.excel_head.iloc[:, 0].values]
+        elif probe.ext == '.csv':
+            # CSV may have inconsistent columns, so just take the first cell of each row
+            col0_values = [row[0] for row in csv.reader(probe.csv_lines) if row]
         else:
             return False
         
@@ -386,7 +433,8 @@ def is_first_energy_format(input_file):
 
 def read_first_energy_format(input_file):
     """
-    Read First Energy format files and return a dict of {customer_id: dataframe} for each customer with interval data.
+    Read First Energy format files and yield (customer_id, dataframe) for each customer with interval data,
+    one customer at a time so callers can write each one out before the next is built.
     
     This format has:
     - Multiple customers in one file, each starting with "Customer Identifier"
@@ -400,67 +448,87 @@ def read_first_energy_format(input_file):
     file_ext = os.path.splitext(input_file)[1].lower()
     
     if file_ext in ['.xlsx', '.xls']:
-        df = pd.read_excel(input_file, header=None)
+        df = pd.read_excel(input_file, engine=_EXCEL_ENGINE, header=None)
     else:
         # CSV has variable column counts - need to read with enough columns
-        # First, find the max number of columns
+        # Read the file once and find the max number of columns by counting
+        # the commas on each line straight from the raw bytes
+        with open(input_file, 'rb') as f:
+            raw = f.read()
+        raw_bytes = np.frombuffer(raw, dtype=np.uint8)
+        line_starts = np.flatnonzero((raw_bytes == ord('\n')) | (raw_bytes == ord('\r'))) + 1
+        line_starts = np.concatenate(([0], line_starts[line_starts < len(raw_bytes)]))
         max_cols = 0
-        with open(input_file, 'r', encoding='utf-8', errors='replace') as f:
-            for line in f:
-                num_cols = len(line.split(','))
-                if num_cols > max_cols:
-                    max_cols = num_cols
+        if len(raw_bytes):
+            max_cols = int(np.add.reduceat(raw_bytes == ord(','), line_starts, dtype=np.int64).max()) + 1
         
-        # Now read with that many columns
+        # Now parse the same buffer with that many columns
         col_names = list(range(max_cols))
         for encoding in ['utf-8', 'latin-1', None]:
             try:
-                df = pd.read_csv(input_file, header=None, names=col_names, encoding=encoding)
+                df = pd.read_csv(io.BytesIO(raw), header=None, names=col_names, encoding=encoding)
                 break
             except:
                 continue
     
-    # Find all customer sections
-    customer_sections = []
-    current_customer = None
-    pending_interval = False
-
-    for i, row in df.iterrows():
-        cell_val = str(row[0]) if pd.notna(row[0]) else ''
-
-        if 'Customer Identifier' in cell_val:
-            # Extract customer ID (remove \t prefix if present)
-            customer_id = str(row[1]).replace('\\t', '').replace('\t', '').strip()
-            current_customer = {'id': customer_id, 'start_row': i, 'meter_blocks': []}
-            customer_sections.append(current_customer)
-            pending_interval = False
-
-        elif 'No Interval Data Found' in cell_val and current_customer:
-            pending_interval = False
+    # Find all customer sections from the section markers in the first column
+    # (checked in priority order, so each row carries at most one marker)
+    col0 = df.iloc[:, 0].astype('string')
+    is_customer = col0.str.contains('Customer Identifier', regex=False, na=False).to_numpy()
+    is_no_data = col0.str.contains('No Interval Data Found', regex=False, na=False).to_numpy() & ~is_customer
+    is_detail = col0.str.contains('Detailed Interval Usage', regex=False, na=False).to_numpy() & ~is_customer & ~is_no_data
+    is_reading = col0.str.contains('Reading Date', regex=False, na=False).to_numpy() & ~is_customer & ~is_no_data & ~is_detail
+
+    customer_rows = np.flatnonzero(is_customer)
+    marker_rows = np.flatnonzero(is_customer | is_no_data | is_detail | is_reading)
+
+    # A "Reading Date" header starts a meter block only when the marker right before it
+    # is a "Detailed Interval Usage" that belongs to a customer section
+    reading_pos = np.flatnonzero(is_reading[marker_rows])
+    reading_pos = reading_pos[reading_pos > 0]
+    prev_rows = marker_rows[reading_pos - 1]
+    starts_block = is_detail[prev_rows]
+    if len(customer_rows):
+        starts_block &= prev_rows > customer_rows[0]
+    else:
+        starts_block[:] = False
+    block_rows = marker_rows[reading_pos[starts_block]]
+    block_owners = np.searchsorted(customer_rows, block_rows, side='right') - 1
 
-        elif 'Detailed Interval Usage' in cell_val and current_customer:
-            pending_interval = True
+    # A meter block's data runs until an empty row or the next section marker
+    stop_rows = np.flatnonzero((col0.isna() | col0.str.contains('Customer', regex=False, na=False)
+                                | col0.str.contains('Detailed Interval Usage', regex=False, na=False)).to_numpy())
 
-        elif 'Reading Date' in cell_val and current_customer and pending_interval:
-            current_customer['meter_blocks'].append({'interval_start': i})
-            pending_interval = False
-    
-    # Set end rows for each customer
-    for i, customer in enumerate(customer_sections):
-        if i + 1 < len(customer_sections):
-            customer['end_row'] = customer_sections[i + 1]['start_row']
-        else:
-            customer['end_row'] = len(df)
+    # Each customer section runs until the next one starts
+    customer_sections = []
+    for n, start_row in enumerate(customer_rows):
+        # Extract customer ID (remove \t prefix if present)
+        customer_id = str(df.iat[start_row, 1]).replace('\\t', '').replace('\t', '').strip()
+        customer_sections.append({
+            'id': customer_id,
+            'start_row': start_row,
+            'end_row': customer_rows[n + 1] if n + 1 < len(customer_rows) else len(df),
+            'meter_blocks': [{'interval_start': i} for i in block_rows[block_owners == n]],
+        })
     
     oprint(f"  Found {len(customer_sections)} customer(s)")
     
-    # Process each customer with interval data
-    customer_data = {}
+    # A repeated customer ID keeps the data of its last section with interval data, in the place
+    # of its first one, as when customers were collected into a dict keyed by ID
+    last_with_data = {customer['id']: customer for customer in customer_sections if customer['meter_blocks']}
+    yielded_ids = set()
     
+    # Process each customer with interval data
     for customer in customer_sections:
         if not customer['meter_blocks']:
             oprint(f"    Customer {customer['id']}: No interval data - skipping")
             continue
+        if customer['id'] in yielded_ids:
+            continue
+        yielded_ids.add(customer['id'])
+        if last_with_data[customer['id']] is not customer:
+            oprint(f"    Customer {customer['id']}: Repeated in file - using its last section")
+            customer = last_with_data[customer['id']]
 
         is_submeter = len(customer['meter_blocks']) > 1
         if is_submeter:
@@ -476,134 +544,177 @@ def read_first_energy_format(input_file):
             header_row_idx = block['interval_start']
             header_row = df.iloc[header_row_idx]
 
-            # Find data rows (from header+1 to end of customer section, stopping at empty rows)
-            data_start = header_row_idx + 1
-            data_end = customer['end_row']
+            # Work out which columns hold interval data and when each interval ends,
+            # once per meter block rather than once per cell
+            interval_idx = []
+            end_minutes = []
+            for col_idx, col_name in enumerate(header_row):
+                col_str = str(col_name).strip()
 
-            # Get interval data for this meter block
-            records = []
+                # Skip non-interval columns (QTY columns and DST columns)
+                if col_str in ['Reading Date', 'nan', ''] or 'QTY' in col_str or 'DST' in col_str:
+                    continue
 
-            for row_idx in range(data_start, data_end):
-                row = df.iloc[row_idx]
+                # Skip "R " (Received) columns - we only want "D " (Delivered) or bare time values
+                if col_str.startswith('R '):
+                    continue
 
-                # Stop if we hit an empty row or new section marker
-                if pd.isna(row[0]) or 'Customer' in str(row[0]) or 'Detailed Interval Usage' in str(row[0]):
-                    break
+                # Strip "D " prefix if present (Delivered energy columns)
+                time_str_raw = col_str
+                if col_str.startswith('D '):
+                    time_str_raw = col_str[2:].strip()
 
-                # Parse the date
+                # Check if this looks like a time column (0015, 0030, etc. or 15, 30, 100, etc.)
                 try:
-                    base_date = pd.to_datetime(row[0])
-                except:
+                    # Handle both "0015" string and 15.0 float formats
+                    if isinstance(col_name, (int, float)) and not pd.isna(col_name):
+                        time_val = int(col_name)
+                    elif time_str_raw.isdigit():
+                        time_val = int(time_str_raw)
+                    else:
+                        continue
+                except (ValueError, TypeError):
                     continue
 
-                # Process each interval column (skip QTY columns and DST columns)
-                for col_idx, col_name in enumerate(header_row):
-                    col_str = str(col_name).strip()
+                # Convert to hour and minute
+                time_str = str(time_val).zfill(4)
+                hour = int(time_str[:-2]) if len(time_str) > 2 else 0
+                minute = int(time_str[-2:])
+
+                # Handle 2359 as the last interval of the day (actually ends at midnight)
+                # First Energy uses 2359 to represent the 23:45-00:00 interval
+                if time_val == 2359:
+                    hour = 24
+                    minute = 0
+                # Skip if not a valid interval (15-min, 30-min, or hourly)
+                elif minute not in [0, 15, 30, 45]:
+                    continue
 
-                    # Skip non-interval columns
-                    if col_str in ['Reading Date', 'nan', ''] or 'QTY' in col_str or 'DST' in col_str:
-                        continue
+                interval_idx.append(col_idx)
+                end_minutes.append(hour * 60 + minute)
 
-                    # Skip "R " (Received) columns - we only want "D " (Delivered) or bare time values
-                    if col_str.startswith('R '):
-                        continue
+            # Find data rows (from header+1 to end of customer section, stopping at empty rows)
+            data_start = header_row_idx + 1
+            next_stop = np.searchsorted(stop_rows, data_start)
+            data_end = min(stop_rows[next_stop] if next_stop < len(stop_rows) else len(df), customer['end_row'])
 
-                    # Strip "D " prefix if present (Delivered energy columns)
-                    time_str_raw = col_str
-                    if col_str.startswith('D '):
-                        time_str_raw = col_str[2:].strip()
-
-                    # Check if this looks like a time column (0015, 0030, etc. or 15, 30, 100, etc.)
-                    try:
-                        # Handle both "0015" string and 15.0 float formats
-                        if isinstance(col_name, (int, float)) and not pd.isna(col_name):
-                            time_val = int(col_name)
-                        elif time_str_raw.isdigit():
-                            time_val = int(time_str_raw)
-                        else:
-                            continue
-
-                        # Convert to hour and minute
-                        time_str = str(time_val).zfill(4)
-                        hour = int(time_str[:-2]) if len(time_str) > 2 else 0
-                        minute = int(time_str[-2:])
-
-                        # Handle 2359 as the last interval of the day (actually ends at midnight)
-                        # First Energy uses 2359 to represent the 23:45-00:00 interval
-                        if time_val == 2359:
-                            hour = 24
-                            minute = 0
-                        # Skip if not a valid interval (15-min, 30-min, or hourly)
-                        elif minute not in [0, 15, 30, 45]:
-                            continue
-
-                        # Get the value
-                        value = row[col_idx]
-                        if pd.isna(value):
-                            continue
-
-                        # Create datetime
-                        if hour == 24:
-                            interval_dt = base_date + timedelta(days=1)
-                        else:
-                            interval_dt = base_date + timedelta(hours=hour, minutes=minute)
-
-                        records.append({'datetime': interval_dt, 'usage': float(value)})
-
-                    except (ValueError, TypeError):
-                        continue
+            # Expand the date x interval grid in one shot, skipping rows whose date won't parse
+            data_rows = df.iloc[data_start:data_end]
+            dates = pd.to_datetime(data_rows.iloc[:, 0], format='mixed', errors='coerce')
+            interval_block = data_rows.iloc[:, interval_idx]
+            try:
+                # Interval cells are normally clean numbers, so cast the whole block in one pass
+                values = interval_block.to_numpy(dtype=float)
+            except (ValueError, TypeError):
+                values = interval_block.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+            records = expand_interval_grid(dates, np.array(end_minutes, dtype='timedelta64[m]'), values)
 
             if is_submeter:
                 oprint(f"      Meter {block_idx + 1}: {len(records)} records")
 
-            all_records.extend(records)
-
-        if all_records:
-            result_df = pd.DataFrame(all_records)
-            result_df = result_df.sort_values('datetime').reset_index(drop=True)
+            all_records.append(records)
 
-            # Sum by datetime (handles both submeter summing and duplicate removal)
-            result_df = result_df.groupby('datetime')['usage'].sum().reset_index()
-            result_df = result_df.sort_values('datetime').reset_index(drop=True)
+        # Concatenate the meter blocks once and sum by datetime (handles both submeter
+        # summing and duplicate removal); the sums come back sorted by datetime
+        result_df = pd.concat(all_records, ignore_index=True)
+        if not result_df.empty:
+            result_df = sum_by_datetime(result_df)
 
-            customer_data[customer['id']] = result_df
             if is_submeter:
                 oprint(f"      Summed to {len(result_df)} interval records")
             else:
                 oprint(f"      Converted to {len(result_df)} interval records")
-    
-    return customer_data
+            yield customer['id'], result_df
 
 def is_esg_multi_meter_format(input_file):
     """Check if this is an ESG format file with multiple meters that need to be summed."""
-    file_ext = os.path.splitext(input_file)[1].lower()
-
     try:
-        if file_ext in ['.xlsx', '.xls']:
-            xlsx = pd.ExcelFile(input_file)
-            if 'IDR Quantity' not in xlsx.sheet_names:
-                return False
-            df = pd.read_excel(xlsx, sheet_name='IDR Quantity', header=5, usecols=[3])
-            if 'Meter Number' not in df.columns:
-                return False
-            unique_meters = df['Meter Number'].dropna().unique()
-            return len(unique_meters) > 1
-        elif file_ext == '.csv':
-            with open(input_file, 'r', encoding='utf-8', errors='replace') as f:
-                for i, line in enumerate(f):
-                    if i > 100:
-                        break
-                    if 'Report Period Date' in line and 'Interval Ending' in line and 'Meter Number' in line:
-                        # Found header with Meter Number - read just that column to check for multiple meters
-                        import csv
-                        df = pd.read_csv(input_file, skiprows=i, usecols=['Meter Number'])
-                        unique_meters = df['Meter Number'].dropna().unique()
-                        return len(unique_meters) > 1
-            return False
-        return False
+        stat = os.stat(input_file)
+        return _has_multiple_esg_meters(os.path.abspath(input_file), stat.st_mtime_ns, stat.st_size)
     except:
         return False
 
+@functools.lru_cache(maxsize=32)
+def _has_multiple_esg_meters(path, mtime_ns, size):
+    """Read just the Meter Number column and count its meters; cached like _read_probe since it's the one check that reads past the file head"""
+    probe = _probe(path)
+    if probe.ext in ['.xlsx', '.xls']:
+        if 'IDR Quantity' not in probe.sheet_names:
+            return False
+        df = pd.read_excel(path, engine=_EXCEL_ENGINE, sheet_name='IDR Quantity', header=5, usecols=[3])
+        if 'Meter Number' not in df.columns:
+            return False
+        unique_meters = df['Meter Number'].dropna().unique()
+        return len(unique_meters) > 1
+    elif probe.ext == '.csv':
+        for i, line in enumerate(probe.csv_lines):
+            if i > 100:
+                break
+            if 'Report Period Date' in line and 'Interval Ending' in line and 'Meter Number' in line:
+                # Found header with Meter Number - read just that column to check for multiple meters
+                df = pd.read_csv(path, skiprows=i, usecols=['Meter Number'])
+                unique_meters = df['Meter Number'].dropna().unique()
+                return len(unique_meters) > 1
+        return False
+    return False
+
+def parse_report_period_dates(values):
+    """
+    Convert ESG Report Period Date values (YYYYMMDD, possibly read as floats or strings)
+    to Timestamps in one vectorized pass. Anything that isn't an 8-digit date becomes NaT.
+    """
+    values = pd.Series(values)
+    date_nums = pd.to_numeric(values, errors='coerce')
+    date_nums = date_nums[np.isfinite(date_nums)]
+    date_strs = date_nums.astype('int64').astype(str)
+    date_strs = date_strs[date_strs.str.len() == 8]
+    dates = pd.to_datetime(date_strs, format='%Y%m%d', errors='coerce', cache=True)
+    return dates.reindex(values.index)
+
+def esg_interval_end_offsets(interval_cols):
+    """
+    Map ESG "Interval Ending HHMM" columns to when each interval ends, parsing each column name once.
+    Returns the columns that carry a time and a timedelta64 offset per column ("2400" = next day 00:00).
+    """
+    valid_cols = []
+    end_minutes = []
+    for col in interval_cols:
+        time_match = _TIME_RE.search(col)
+        if time_match:
+            hour, minute = int(time_match.group(1)[:2]), int(time_match.group(1)[2:])
+            valid_cols.append(col)
+            end_minutes.append(24 * 60 if hour == 24 else hour * 60 + minute)
+    return valid_cols, np.array(end_minutes, dtype='timedelta64[m]')
+
+def read_idr_quantity_sheet(input_file):
+    """Read the ESG 'IDR Quantity' sheet, parsing only the date, meter, unit and interval columns"""
+    return pd.read_excel(input_file, engine=_EXCEL_ENGINE, sheet_name='IDR Quantity', header=5,
+                         usecols=lambda col: col in ('Report Period Date', 'Meter Number', 'Measurement Unit')
+                                             or str(col).startswith('Interval Ending'))
+
+def read_esg_csv(input_file):
+    """
+    Read an ESG CSV starting at its "Report Period Date" / "Interval Ending" header row.
+    The file is read from disk once; the header scan and the parse share the same buffer.
+    """
+    with open(input_file, 'rb') as f:
+        raw = f.read()
+    
+    # Use csv module to correctly count rows regardless of column count variations;
+    # newline=None translates \r and \r\n line endings as text-mode open() did
+    header_row = None
+    reader = csv.reader(io.StringIO(raw.decode('utf-8', errors='replace'), newline=None))
+    for i, row in enumerate(reader):
+        row_str = ','.join(row)
+        if 'Report Period Date' in row_str and 'Interval Ending' in row_str:
+            header_row = i
+            break
+    
+    if header_row is not None:
+        # Use skiprows to skip all rows before the header, then pandas uses row 0 as header
+        return pd.read_csv(io.BytesIO(raw), skiprows=header_row, on_bad_lines='skip')
+    return pd.read_csv(io.BytesIO(raw), on_bad_lines='skip')
+
 def read_esg_multi_meter_format(input_file):
     """
     Read ESG format files with multiple meters and sum their usage values.
@@ -617,21 +728,9 @@ def read_esg_multi_meter_format(input_file):
 
     # Read the file
     if file_ext in ['.xlsx', '.xls']:
-        df = pd.read_excel(input_file, sheet_name='IDR Quantity', header=5)
+        df = read_idr_quantity_sheet(input_file)
     else:
-        import csv
-        header_row = None
-        with open(input_file, 'r', encoding='utf-8', errors='replace') as f:
-            reader = csv.reader(f)
-            for i, row in enumerate(reader):
-                row_str = ','.join(row)
-                if 'Report Period Date' in row_str and 'Interval Ending' in row_str:
-                    header_row = i
-                    break
-        if header_row is not None:
-            df = pd.read_csv(input_file, skiprows=header_row, on_bad_lines='skip')
-        else:
-            df = pd.read_csv(input_file, on_bad_lines='skip')
+        df = read_esg_csv(input_file)
 
     # Filter for KH Measurement Unit if the column exists
     if 'Measurement Unit' in df.columns:
@@ -656,54 +755,26 @@ def read_esg_multi_meter_format(input_file):
     # Sum across meters for each date/interval by grouping by Report Period Date
     # This handles both multi-meter summing and duplicate date combining
     numeric_cols = interval_cols + ds_cols
-    for col in numeric_cols:
-        df[col] = pd.to_numeric(df[col], errors='coerce')
+    numeric_values = df[numeric_cols].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
 
-    df_summed = df.groupby('Report Period Date')[numeric_cols].sum().reset_index()
+    df_summed = sum_by_date(df['Report Period Date'], numeric_values, numeric_cols, 'Report Period Date')
     oprint(f"  Summed {len(df)} rows across meters to {len(df_summed)} unique dates")
 
-    # Convert to long format (datetime, usage)
-    records = []
-
-    for _, row in df_summed.iterrows():
-        date_val = row['Report Period Date']
-        if pd.isna(date_val):
-            continue
-
-        try:
-            date_int = int(float(date_val))
-            date_str = str(date_int)
-            if len(date_str) != 8:
-                continue
-            base_date = pd.to_datetime(date_str, format='%Y%m%d')
-        except (ValueError, TypeError):
-            continue
+    # Parse every Report Period Date up front (invalid dates become NaT and are skipped)
+    base_dates = parse_report_period_dates(df_summed['Report Period Date'])
 
-        # Process regular interval columns only (ignore DS columns)
-        for col in interval_cols:
-            time_match = re.search(r'(\d{4})$', col)
-            if time_match:
-                time_str = time_match.group(1)
-                hour = int(time_str[:2])
-                minute = int(time_str[2:])
-
-                if hour == 24:
-                    interval_dt = base_date + timedelta(days=1)
-                else:
-                    interval_dt = base_date + timedelta(hours=hour, minutes=minute)
-
-                value = row[col]
-                if pd.notna(value) and value != 0:
-                    try:
-                        records.append({'datetime': interval_dt, 'usage': float(value)})
-                    except (ValueError, TypeError):
-                        continue
+    # Map regular interval columns to their end time (ignore DS columns)
+    valid_cols, end_offsets = esg_interval_end_offsets(interval_cols)
 
-    result_df = pd.DataFrame(records)
+    # Convert to long format (datetime, usage); zero readings are skipped along with blanks
+    values = df_summed[valid_cols].to_numpy(dtype=float)
+    values = np.where(values == 0, np.nan, values)
+    result_df = expand_interval_grid(base_dates, end_offsets, values)
 
     # Group by datetime and sum (in case of any remaining overlaps)
-    result_df = result_df.groupby('datetime')['usage'].sum().reset_index()
-    result_df = result_df.sort_values('datetime').reset_index(drop=True)
+    if not result_df['datetime'].is_unique:
+        result_df = sum_by_datetime(result_df)
+    result_df = sort_by_datetime(result_df)
 
     # Detect if hourly data - shift timestamps to start-of-hour
     if len(result_df) >= 2:
@@ -718,21 +789,18 @@ def read_esg_multi_meter_format(input_file):
 
 def is_esg_format(input_file):
     """Check if this is an ESG format file (Excel with IDR Quantity sheet, or CSV with same columns)"""
-    file_ext = os.path.splitext(input_file)[1].lower()
-    
     try:
-        if file_ext in ['.xlsx', '.xls']:
-            xlsx = pd.ExcelFile(input_file)
-            return 'IDR Quantity' in xlsx.sheet_names
-        elif file_ext == '.csv':
+        probe = _probe(input_file)
+        if probe.ext in ['.xlsx', '.xls']:
+            return 'IDR Quantity' in probe.sheet_names
+        elif probe.ext == '.csv':
             # ESG CSVs can have multi-section format with headers scattered throughout
-            # Read line by line to find the interval data section
-            with open(input_file, 'r', encoding='utf-8', errors='replace') as f:
-                for i, line in enumerate(f):
-                    if i > 100:  # Don't scan more than 100 lines
-                        break
-                    if 'Report Period Date' in line and 'Interval Ending' in line:
-                        return True
+            # Scan line by line to find the interval data section
+            for i, line in enumerate(probe.csv_lines):
+                if i > 100:  # Don't scan more than 100 lines
+                    break
+                if 'Report Period Date' in line and 'Interval Ending' in line:
+                    return True
             return False
         return False
     except:
@@ -740,18 +808,18 @@ def is_esg_format(input_file):
 
 def is_bge_format(input_file):
     """Check if this is a BGE format file (with RdgDate/ReadDate and Kwh columns)"""
-    file_ext = os.path.splitext(input_file)[1].lower()
-    
     try:
-        # Read just the header row based on file type
-        if file_ext == '.csv':
-            df = pd.read_csv(input_file, nrows=1, index_col=False)
-        elif file_ext in ['.xlsx', '.xls']:
-            df = pd.read_excel(input_file, nrows=1)
+        # Take the header row from the shared file head (first non-blank row)
+        probe = _probe(input_file)
+        if probe.ext == '.csv':
+            header = next((row for row in csv.reader(probe.csv_lines) if row), [])
+        elif probe.ext in ['.xlsx', '.xls']:
+            head = probe.excel_head.dropna(how='all')
+            header = head.iloc[0].dropna().tolist() if len(head) else []
         else:
             return False
         
-        cols = [c.lower() for c in df.columns]
+        cols = [str(c).lower() for c in header]
         
         # Check for BGE 15-min format (RdgDate) or BGE Hourly format (ReadDate)
         has_date_col = 'rdgdate' in cols or 'readdate' in cols
@@ -781,7 +849,7 @@ def read_bge_format(input_file):
     if file_ext == '.csv':
         df = pd.read_csv(input_file, index_col=False)
     else:
-        df = pd.read_excel(input_file)
+        df = pd.read_excel(input_file, engine=_EXCEL_ENGINE)
     
     # Determine which date column exists (case-insensitive search)
     cols_lower = {c.lower(): c for c in df.columns}
@@ -808,74 +876,41 @@ def read_bge_format(input_file):
         endtime_col = cols_lower['endtime']
         oprint(f"  Using columns: {date_col}, {endtime_col}, {kwh_col}")
     
-    records = []
-    for _, row in df.iterrows():
-        date_val = row[date_col]
-        kwh_val = row[kwh_col]
-        
-        if pd.isna(date_val) or pd.isna(kwh_val):
-            continue
-        
-        # Parse date
-        try:
-            base_date = pd.to_datetime(date_val)
-        except:
-            continue
-        
-        if format_type == 'HI':
-            if has_starttime:
-                # New HI format: StartTime like 0000, 0100, 0200...
-                # StartTime 0000 = hour 0, 0100 = hour 1, etc.
-                starttime_val = row[starttime_col]
-                if pd.isna(starttime_val):
-                    continue
-                starttime_int = int(starttime_val)
-                # Parse HHMM format
-                hour = starttime_int // 100
-                minute = 0  # Use :00 for hourly data labels
-            else:
-                # Old HI format: EndTime like 59, 159, 259...
-                endtime_val = row[cols_lower['endtime']]
-                if pd.isna(endtime_val):
-                    continue
-                endtime_int = int(endtime_val)
-                # EndTime 59 = hour 0, 159 = hour 1, etc.
-                # Parse by looking at digits before the 59
-                endtime_str = str(endtime_int)
-                if endtime_str.endswith('59'):
-                    hour = int(endtime_str[:-2]) if len(endtime_str) > 2 else 0
-                else:
-                    hour = endtime_int // 100
-                minute = 0
-        else:
-            # EI format: EndTime like 15, 30, 45, 100, 115...
-            # These are actual interval end times
-            endtime_val = row[cols_lower['endtime']]
-            if pd.isna(endtime_val):
-                continue
-            endtime_int = int(endtime_val)
-            if endtime_int < 100:
-                hour = 0
-                minute = endtime_int
-            else:
-                endtime_str = str(endtime_int).zfill(4)
-                hour = int(endtime_str[:-2]) if len(endtime_str) > 2 else 0
-                minute = int(endtime_str[-2:])
-        
-        # Create the datetime
-        if hour == 24:
-            interval_dt = base_date + timedelta(days=1)
-        else:
-            interval_dt = base_date + timedelta(hours=hour, minutes=minute)
-        
-        records.append({'datetime': interval_dt, 'usage': float(kwh_val)})
+    # Work on whole columns: rows without a parseable date, numeric time, or kWh value are skipped.
+    # format='mixed' parses each date on its own, as the per-row loop did, so a file mixing date
+    # styles doesn't lose every row that differs from the first
+    base_dates = pd.to_datetime(df[date_col], format='mixed', errors='coerce')
+    # Only the hourly (HI) format is labeled by StartTime; EI data always uses its EndTime
+    time_col = starttime_col if format_type == 'HI' and has_starttime else cols_lower['endtime']
+    time_vals = pd.to_numeric(df[time_col], errors='coerce')
+    usage = pd.to_numeric(df[kwh_col], errors='coerce')
+    valid = (base_dates.notna() & time_vals.notna() & usage.notna()).to_numpy()
+    
+    base_dates = base_dates.to_numpy()[valid]
+    time_ints = time_vals.to_numpy()[valid].astype(np.int64)
+    
+    if format_type == 'HI':
+        # New HI format: StartTime like 0000, 0100, 0200... (StartTime 0100 = hour 1)
+        # Old HI format: EndTime like 59, 159, 259... (EndTime 159 = hour 1)
+        # Either way the hour is the digits before the last two (EndTime 2359 // 100 = 23, the
+        # same as stripping the trailing "59"); use :00 for hourly data labels
+        hours = time_ints // 100
+        minutes = 0
+    else:
+        # EI format: EndTime like 15, 30, 45, 100, 115... (HHMM, actual interval end times)
+        # Values under 100 come out as hour 0, so one divmod covers every row
+        hours, minutes = np.divmod(time_ints, 100)
+    
+    # Hour 24 means midnight at the start of the next day
+    offsets = np.where(hours == 24, 24 * 60, hours * 60 + minutes).astype('timedelta64[m]')
     
-    result_df = pd.DataFrame(records)
-    result_df = result_df.sort_values('datetime').reset_index(drop=True)
+    result_df = pd.DataFrame({'datetime': base_dates + offsets, 'usage': usage.to_numpy(dtype=float)[valid]})
+    if not result_df['datetime'].is_monotonic_increasing:
+        result_df = result_df.sort_values('datetime', kind='stable')
     
     # Remove duplicates - keep FIRST occurrence (for DST fall-back, don't sum the duplicate hours)
-    result_df = result_df.drop_duplicates(subset=['datetime'], keep='first')
-    result_df = result_df.sort_values('datetime').reset_index(drop=True)
+    # drop_duplicates keeps the sorted order, so only the index needs resetting
+    result_df = result_df.drop_duplicates(subset=['datetime'], keep='first').reset_index(drop=True)
     
     oprint(f"  Converted to {len(result_df)} interval records")
     
@@ -898,7 +933,7 @@ def read_esg_format(input_file):
     
     # Read the file based on type
     if file_ext in ['.xlsx', '.xls']:
-        df = pd.read_excel(input_file, sheet_name='IDR Quantity', header=5)
+        df = read_idr_quantity_sheet(input_file)
         
         # Filter for KH Measurement Unit if the column exists (Excel files)
         if 'Measurement Unit' in df.columns:
@@ -910,24 +945,8 @@ def read_esg_format(input_file):
             elif kh_count == total_count:
                 oprint(f"  All {total_count} rows have 'KH' Measurement Unit")
     else:
-        # CSV - find the header row with "Report Period Date" and "Interval Ending"
-        # Multi-section CSVs may have the interval data section much further down
-        # Use csv module to correctly count rows regardless of column count variations
-        import csv
-        header_row = None
-        with open(input_file, 'r', encoding='utf-8', errors='replace') as f:
-            reader = csv.reader(f)
-            for i, row in enumerate(reader):
-                row_str = ','.join(row)
-                if 'Report Period Date' in row_str and 'Interval Ending' in row_str:
-                    header_row = i
-                    break
-        
-        if header_row is not None:
-            # Use skiprows to skip all rows before the header, then pandas uses row 0 as header
-            df = pd.read_csv(input_file, skiprows=header_row, on_bad_lines='skip')
-        else:
-            df = pd.read_csv(input_file, on_bad_lines='skip')
+        # CSV - multi-section CSVs may have the interval data section much further down
+        df = read_esg_csv(input_file)
     
     # Filter for KH Measurement Unit if the column exists
     # KH = kWh data (the proper interval data to use)
@@ -949,97 +968,30 @@ def read_esg_format(input_file):
     oprint(f"  Found {len(ds_cols)} DST fall-back columns (ignoring to keep days uniform)")
     
     # Check for duplicate dates and combine them
-    date_counts = df['Report Period Date'].value_counts()
-    dups = date_counts[date_counts > 1]
-    if len(dups) > 0:
-        oprint(f"  Found {len(dups)} dates with multiple rows - combining...")
-        
-        # Re-read the original file to get all data for combining
-        if file_ext in ['.xlsx', '.xls']:
-            df_orig = pd.read_excel(input_file, sheet_name='IDR Quantity', header=5)
-        else:
-            # CSV - use same header row detection for multi-section files
-            import csv
-            header_row = None
-            with open(input_file, 'r', encoding='utf-8', errors='replace') as f:
-                reader = csv.reader(f)
-                for i, row in enumerate(reader):
-                    row_str = ','.join(row)
-                    if 'Report Period Date' in row_str and 'Interval Ending' in row_str:
-                        header_row = i
-                        break
-            if header_row is not None:
-                df_orig = pd.read_csv(input_file, skiprows=header_row, on_bad_lines='skip')
-            else:
-                df_orig = pd.read_csv(input_file, on_bad_lines='skip')
+    is_dup = df['Report Period Date'].duplicated(keep=False) & df['Report Period Date'].notna()
+    if is_dup.any():
+        num_dup_dates = df.loc[is_dup, 'Report Period Date'].nunique()
+        oprint(f"  Found {num_dup_dates} dates with multiple rows - combining...")
         
         # For each date, combine the interval values (take the first non-null value)
-        combined_rows = []
-        for date in df_orig['Report Period Date'].unique():
-            date_rows = df_orig[df_orig['Report Period Date'] == date]
-            combined_row = {'Report Period Date': date}
-            
-            # For each interval column, take the first non-null value
-            for col in interval_cols + ds_cols:
-                values = date_rows[col].dropna()
-                if len(values) > 0:
-                    combined_row[col] = values.iloc[0]
-                else:
-                    combined_row[col] = None
-            
-            combined_rows.append(combined_row)
-        
-        df = pd.DataFrame(combined_rows)
+        df = df.groupby('Report Period Date', as_index=False, sort=False)[interval_cols + ds_cols].first()
         oprint(f"  Combined to {len(df)} unique dates")
     
-    # Convert to long format (datetime, usage)
-    records = []
+    # Parse every Report Period Date up front (missing or non-numeric dates like
+    # "Transaction Count" become NaT and are skipped)
+    base_dates = parse_report_period_dates(df['Report Period Date'])
     
-    for _, row in df.iterrows():
-        # Skip rows with missing or invalid dates
-        date_val = row['Report Period Date']
-        if pd.isna(date_val):
-            continue
-        
-        # Try to convert to integer - skip if it fails (non-numeric like "Transaction Count")
-        try:
-            date_int = int(float(date_val))
-            date_str = str(date_int)
-            # Basic validation: should be 8 digits (YYYYMMDD)
-            if len(date_str) != 8:
-                continue
-            base_date = pd.to_datetime(date_str, format='%Y%m%d')
-        except (ValueError, TypeError):
-            continue
-        
-        # Process regular interval columns only (ignore DS columns for November fall-back)
-        # This keeps all days uniform at 24 hours
-        for col in interval_cols:
-            # Extract time from column name like "Interval Ending 0015" -> "0015"
-            time_match = re.search(r'(\d{4})$', col)
-            if time_match:
-                time_str = time_match.group(1)
-                hour = int(time_str[:2])
-                minute = int(time_str[2:])
-                
-                # Handle "2400" as next day 00:00
-                if hour == 24:
-                    interval_dt = base_date + timedelta(days=1)
-                else:
-                    interval_dt = base_date + timedelta(hours=hour, minutes=minute)
-                
-                value = row[col]
-                if pd.notna(value):
-                    try:
-                        records.append({'datetime': interval_dt, 'usage': float(value)})
-                    except (ValueError, TypeError):
-                        continue
+    # Process regular interval columns only (ignore DS columns for November fall-back)
+    # This keeps all days uniform at 24 hours
+    # Extract time from column name like "Interval Ending 0015" -> "0015"
+    valid_cols, end_offsets = esg_interval_end_offsets(interval_cols)
     
-    result_df = pd.DataFrame(records)
+    # Convert to long format (datetime, usage); blank or non-numeric cells are skipped
+    values = df[valid_cols].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+    result_df = expand_interval_grid(base_dates, end_offsets, values)
     
     # Sort and remove exact duplicates, sum values for same datetime
-    result_df = result_df.groupby('datetime')['usage'].sum().reset_index()
-    result_df = result_df.sort_values('datetime').reset_index(drop=True)
+    result_df = sum_by_datetime(result_df)
     
     # Detect if this is hourly data (intervals are 60 minutes apart)
     # If so, shift timestamps back by 1 hour since "Interval Ending 0100" means the 00:00 hour
@@ -1062,46 +1014,43 @@ def fill_dst_gap_intervals(df, interval_minutes):
     For 30-min data: gap jumps from 2:00 to 3:30, missing 2:30 and 3:00
     For 15-min data: gap jumps from 2:00 to 3:15, missing 2:15, 2:30, 2:45, 3:00
     """
-    df = df.sort_values('datetime').reset_index(drop=True)
+    df = sort_by_datetime(df)
     
     expected_diff = timedelta(minutes=interval_minutes)
-    rows_to_insert = []
-    
-    for i in range(len(df) - 1):
-        current_time = df.loc[i, 'datetime']
-        next_time = df.loc[i + 1, 'datetime']
-        actual_diff = next_time - current_time
+    insert_times = []
+    insert_values = []
+    
+    # Compare every timestamp with the next one in a single pass
+    times = df['datetime']
+    usage = df['usage'].to_numpy()
+    actual_diffs = times.shift(-1) - times
+    missing_counts = actual_diffs // expected_diff - 1
+    
+    # A gap larger than expected is a DST gap if it's in March, around 1-3 AM
+    # Hour 0-3 covers cases where timestamps are labeled by start or end time
+    is_dst_gap = ((actual_diffs > expected_diff * 1.5) & (missing_counts > 0)
+                  & (times.dt.month == 3) & (times.dt.hour <= 3)).to_numpy()
+    
+    for i in np.flatnonzero(is_dst_gap):
+        current_time = times.iat[i]
+        next_time = times.iat[i + 1]
+        missing_intervals = int(missing_counts.iat[i])
         
-        # Check if there's a gap larger than expected (DST gap)
-        if actual_diff > expected_diff * 1.5:
-            # Calculate how many intervals are missing
-            missing_intervals = int(actual_diff / expected_diff) - 1
-            
-            if missing_intervals > 0:
-                # Verify it's likely a DST gap (March, around 1-3 AM)
-                # Hour 0-3 covers cases where timestamps are labeled by start or end time
-                if current_time.month == 3 and 0 <= current_time.hour <= 3:
-                    # Get the average of the value before and after the gap
-                    value_before = df.loc[i, 'usage']
-                    value_after = df.loc[i + 1, 'usage']
-                    avg_value = (value_before + value_after) / 2
-                    
-                    oprint(f"    DST gap detected: {current_time} -> {next_time}")
-                    oprint(f"    Inserting {missing_intervals} interval(s) with value {avg_value:.3f}")
-                    
-                    # Insert each missing interval with the averaged value
-                    for j in range(1, missing_intervals + 1):
-                        missing_time = current_time + (expected_diff * j)
-                        rows_to_insert.append({
-                            'datetime': missing_time,
-                            'usage': round(avg_value, 3)
-                        })
-    
-    if rows_to_insert:
-        new_rows_df = pd.DataFrame(rows_to_insert)
+        # Get the average of the value before and after the gap
+        avg_value = (usage[i] + usage[i + 1]) / 2
+        
+        oprint(f"    DST gap detected: {current_time} -> {next_time}")
+        oprint(f"    Inserting {missing_intervals} interval(s) with value {avg_value:.3f}")
+        
+        # Insert each missing interval with the averaged value
+        insert_times.append(current_time.to_datetime64() + np.arange(1, missing_intervals + 1) * np.timedelta64(expected_diff))
+        insert_values.append(np.full(missing_intervals, round(avg_value, 3)))
+    
+    if insert_times:
+        new_rows_df = pd.DataFrame({'datetime': np.concatenate(insert_times), 'usage': np.concatenate(insert_values)})
         df = pd.concat([df, new_rows_df], ignore_index=True)
-        df = df.sort_values('datetime').reset_index(drop=True)
-        oprint(f"    ✓ Filled {len(rows_to_insert)} missing interval(s)")
+        df = sort_by_datetime(df)
+        oprint(f"    ✓ Filled {len(new_rows_df)} missing interval(s)")
     
     return df
 
@@ -1137,38 +1086,34 @@ def format_single_dataset(df, detected_interval):
     df = fill_dst_gap_intervals(df, detected_interval)
     
     # Resample to hourly if needed (sum the values)
-    df.set_index('datetime', inplace=True)
-    
     if detected_interval == 60:
         # Data is already hourly - just aggregate any duplicates, no time shifting needed
-        hourly_df = df.groupby(df.index).sum()
-        hourly_df.reset_index(inplace=True)
+        hourly_df = sum_by_datetime(df)
     else:
         # Sub-hourly data needs resampling
         # closed='right' means interval (0:00, 1:00] goes to 1:00 bucket
         # label='left' means the bucket is labeled with its start time (00:00-23:00)
-        hourly_df = df.resample('h', closed='right', label='left').sum()
-        hourly_df.reset_index(inplace=True)
+        # so each interval belongs to the hour before its ceiling
+        has_time = df['datetime'].notna()
+        buckets = df['datetime'][has_time].dt.ceil('h') - timedelta(hours=1)
+        
+        # groupby sums with the same compensated summation as resample(); hours with no
+        # readings are filled with 0 like resample().sum()
+        hour_sums = df['usage'][has_time].groupby(buckets.to_numpy(), sort=True).sum()
+        hour_idx = pd.date_range(buckets.min(), buckets.max(), freq='h')
+        hourly_df = pd.DataFrame({'datetime': hour_idx, 'usage': hour_sums.reindex(hour_idx, fill_value=0).to_numpy()})
     
-    # Sort newest to oldest for splitting into years
-    combined_df = hourly_df.sort_values('datetime', ascending=False)
-    combined_df.reset_index(drop=True, inplace=True)
+    # Sort oldest to newest once; the year split below works from the newest end
+    combined_df = sort_by_datetime(hourly_df)
     
     # Round usage to 3 decimal places
     combined_df['usage'] = combined_df['usage'].round(3)
     
     oprint(f"  Total hourly records: {len(combined_df)}")
     
-    # Create output DataFrame
-    output_data = {}
-    
-    # Column A & B: Full dataset (oldest to newest)
-    full_dataset_sorted = combined_df.sort_values('datetime', ascending=True)
-    output_data['Intv End Date/Time'] = full_dataset_sorted['datetime'].dt.strftime('%m/%d/%Y %H:%M')
-    output_data[' Usage'] = full_dataset_sorted['usage']
-    
-    # Blank column C
-    output_data[''] = ''
+    # Format every timestamp once; the year columns reuse slices of the same strings
+    date_strs = combined_df['datetime'].dt.strftime('%m/%d/%Y %H:%M').tolist()
+    usage_vals = combined_df['usage'].tolist()
     
     # Split into 8760-hour segments (years)
     total_hours = len(combined_df)
@@ -1176,53 +1121,47 @@ def format_single_dataset(df, detected_interval):
     
     oprint(f"  Segmenting into {num_years} year(s)...")
     
-    # Sort newest to oldest for slicing into years
-    newest_first = combined_df.sort_values('datetime', ascending=False).reset_index(drop=True)
+    # Create output columns, each sized once: row 0 is the header row, data starts at row 1,
+    # and shorter columns are padded with blanks down to the full dataset length
+    output_data = {}
+    n_rows = total_hours + 1
+    
+    # Column A & B: Full dataset (oldest to newest)
+    full_dates = np.full(n_rows, '', dtype=object)
+    full_dates[0] = 'OUTPUT'
+    full_dates[1:] = date_strs
+    full_usage = np.full(n_rows, '', dtype=object)
+    full_usage[1:] = usage_vals
+    output_data['Intv End Date/Time'] = full_dates
+    output_data[' Usage'] = full_usage
+    
+    # Blank column C
+    output_data[''] = np.full(n_rows, '', dtype=object)
     
     for year_num in range(num_years):
-        start_idx = year_num * 8760
-        end_idx = min((year_num + 1) * 8760, total_hours)
-        
-        year_data = newest_first.iloc[start_idx:end_idx].copy()
-        year_data = year_data.sort_values('datetime', ascending=True)
+        # Year 1 is the newest 8760 hours, year 2 the 8760 before that, etc.
+        # Counted back from the newest end, each year is already oldest to newest
+        start_idx = max(total_hours - (year_num + 1) * 8760, 0)
+        end_idx = total_hours - year_num * 8760
+        year_len = end_idx - start_idx
         
         year_col_name_date = f'YEAR {year_num + 1} - Intv End Date/Time'
         year_col_name_usage = f'YEAR {year_num + 1} -  Usage'
         
-        year_dates = year_data['datetime'].dt.strftime('%m/%d/%Y %H:%M').tolist()
-        year_usage = year_data['usage'].tolist()
-        
-        while len(year_dates) < total_hours:
-            year_dates.append('')
-            year_usage.append('')
+        year_dates = np.full(n_rows, '', dtype=object)
+        year_dates[0] = f'YEAR {year_num + 1}'
+        year_dates[1:year_len + 1] = date_strs[start_idx:end_idx]
+        year_usage = np.full(n_rows, '', dtype=object)
+        year_usage[1:year_len + 1] = usage_vals[start_idx:end_idx]
         
         output_data[year_col_name_date] = year_dates
         output_data[year_col_name_usage] = year_usage
         
         if year_num < num_years - 1:
-            output_data[f'  {year_num}'] = ''
+            output_data[f'  {year_num}'] = np.full(n_rows, '', dtype=object)
     
-    # Create DataFrame
     output_df = pd.DataFrame(output_data)
     
-    # Add header row
-    header_row = {}
-    header_row['Intv End Date/Time'] = 'OUTPUT'
-    header_row[' Usage'] = ''
-    header_row[''] = ''
-    
-    for year_num in range(num_years):
-        year_col_name_date = f'YEAR {year_num + 1} - Intv End Date/Time'
-        year_col_name_usage = f'YEAR {year_num + 1} -  Usage'
-        
-        header_row[year_col_name_date] = f'YEAR {year_num + 1}'
-        header_row[year_col_name_usage] = ''
-        
-        if year_num < num_years - 1:
-            header_row[f'  {year_num}'] = ''
-    
-    output_df = pd.concat([pd.DataFrame([header_row]), output_df], ignore_index=True)
-    
     return output_df
 
 def format_interval_data(input_file):
@@ -1236,9 +1175,12 @@ def format_interval_data(input_file):
     try:
         # Check if this is First Energy format (must check first as it has special multi-customer handling)
         if is_first_energy_format(input_file):
+            # Customers are read and written one at a time; peek at the first so no
+            # workbook is created when there is nothing to write
             customer_data = read_first_energy_format(input_file)
+            first_customer = next(customer_data, None)
             
-            if not customer_data:
+            if first_customer is None:
                 oprint("  ✗ No interval data found in any customer section")
                 return None
             
@@ -1248,34 +1190,43 @@ def format_interval_data(input_file):
             output_file = os.path.join(output_dir, f"{base_name}_formatted.xlsx")
             
             # Process each customer and write to separate sheets
-            with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-                for customer_id, df in customer_data.items():
-                    oprint(f"\n  Processing customer {customer_id}...")
+            # Write to a temporary file and only move it into place once every sheet is written,
+            # so a failure part way through doesn't leave a partial workbook behind
+            temp_file = os.path.join(output_dir, f"~{base_name}_formatted.xlsx")
+            try:
+                with pd.ExcelWriter(temp_file, engine='openpyxl') as writer:
+                    for customer_id, df in itertools.chain([first_customer], customer_data):
+                        oprint(f"\n  Processing customer {customer_id}...")
                     
-                    # Sort and remove duplicates
-                    df = df.sort_values('datetime').reset_index(drop=True)
-                    original_len = len(df)
-                    df = df.drop_duplicates(subset=['datetime'], keep='first').reset_index(drop=True)
-                    if len(df) < original_len:
-                        print(f"  Removed {original_len - len(df)} duplicate timestamp(s)")
+                        # Sort and remove duplicates
+                        df = sort_by_datetime(df)
+                        original_len = len(df)
+                        df = df.drop_duplicates(subset=['datetime'], keep='first').reset_index(drop=True)
+                        if len(df) < original_len:
+                            print(f"  Removed {original_len - len(df)} duplicate timestamp(s)")
                     
-                    # Detect interval
-                    detected_interval = 15  # Default for First Energy
-                    if len(df) > 1:
-                        time_diff = (df['datetime'].iloc[1] - df['datetime'].iloc[0]).total_seconds() / 60
-                        detected_interval = int(time_diff)
+                        # Detect interval
+                        detected_interval = 15  # Default for First Energy
+                        if len(df) > 1:
+                            time_diff = (df['datetime'].iloc[1] - df['datetime'].iloc[0]).total_seconds() / 60
+                            detected_interval = int(time_diff)
                     
-                    oprint(f"  Detected interval: {detected_interval} minutes")
-                    oprint(f"  Total raw records: {len(df)}")
-                    oprint(f"  Data range: {df['datetime'].iloc[0]} to {df['datetime'].iloc[-1]}")
+                        oprint(f"  Detected interval: {detected_interval} minutes")
+                        oprint(f"  Total raw records: {len(df)}")
+                        oprint(f"  Data range: {df['datetime'].iloc[0]} to {df['datetime'].iloc[-1]}")
                     
-                    # Format the dataset
-                    output_df = format_single_dataset(df, detected_interval)
+                        # Format the dataset
+                        output_df = format_single_dataset(df, detected_interval)
                     
-                    # Write to sheet (sheet name limited to 31 chars)
-                    sheet_name = str(customer_id)[:31]
-                    output_df.to_excel(writer, sheet_name=sheet_name, index=False)
-                    oprint(f"  ✓ Added sheet: {sheet_name}")
+                        # Write to sheet (sheet name limited to 31 chars)
+                        sheet_name = str(customer_id)[:31]
+                        output_df.to_excel(writer, sheet_name=sheet_name, index=False)
+                        oprint(f"  ✓ Added sheet: {sheet_name}")
+                os.replace(temp_file, output_file)
+            except BaseException:
+                if os.path.exists(temp_file):
+                    os.remove(temp_file)
+                raise
             
             oprint(f"\n  ✓ Saved to: {output_file}")
             return output_file
@@ -1298,7 +1249,7 @@ def format_interval_data(input_file):
         # Standard PSEG format - Excel
         elif file_ext in ['.xlsx', '.xls']:
             oprint("  Detected PSEG format (Excel)")
-            df = pd.read_excel(input_file, skiprows=3, usecols=[0, 1], names=['datetime', 'usage'])
+            df = pd.read_excel(input_file, engine=_EXCEL_ENGINE, skiprows=3, usecols=[0, 1], names=['datetime', 'usage'])
             df['datetime'] = pd.to_datetime(df['datetime'])
         # Standard PSEG format - CSV
         elif file_ext == '.csv':
@@ -1314,7 +1265,7 @@ def format_interval_data(input_file):
             return None
         
         # Sort by datetime
-        df = df.sort_values('datetime').reset_index(drop=True)
+        df = sort_by_datetime(df)
         
         # Remove any duplicate timestamps (keep first occurrence)
         original_len = len(df)
@@ -1357,7 +1308,7 @@ def format_interval_data(input_file):
 # MAIN
 # ============================================================
 
-import sys, io
+import sys
 
 # Ensure stdout can handle Unicode (fixes cp1252 terminals)
 if sys.stdout.encoding and sys.stdout.encoding.lower().replace('-', '') != 'utf8':